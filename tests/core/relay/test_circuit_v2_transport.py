@@ -2,19 +2,21 @@
 
 import logging
 import time
+from types import SimpleNamespace
 
 import pytest
 from multiaddr import Multiaddr
 import trio
 
 from libp2p.custom_types import TProtocol
-from libp2p.network.stream.exceptions import (
-    StreamEOF,
-    StreamReset,
+from libp2p.peer.id import (
+    ID,
+)
+from libp2p.peer.peerinfo import (
+    PeerInfo,
 )
 from libp2p.relay.circuit_v2.config import RelayConfig, RelayRole
 from libp2p.relay.circuit_v2.discovery import (
-    RelayDiscovery,
     RelayInfo,
 )
 from libp2p.relay.circuit_v2.protocol import (
@@ -26,24 +28,21 @@ from libp2p.relay.circuit_v2.protocol import (
 from libp2p.relay.circuit_v2.transport import (
     CircuitV2Transport,
 )
-from libp2p.tools.constants import (
-    MAX_READ_LEN,
-)
 from libp2p.tools.utils import (
     connect,
 )
 from tests.utils.factories import (
     HostFactory,
 )
+from tests.utils.utils import (
+    wait_until_connected,
+)
 
 logger = logging.getLogger(__name__)
 
 # Test timeouts
 CONNECT_TIMEOUT = 15  # seconds
-STREAM_TIMEOUT = 15  # seconds
-HANDLER_TIMEOUT = 15  # seconds
-SLEEP_TIME = 1.0  # seconds
-RELAY_TIMEOUT = 20  # seconds
+MESSAGE_TIMEOUT = 5  # seconds
 
 # Default limits for relay
 DEFAULT_RELAY_LIMITS = RelayLimits(
@@ -53,116 +52,123 @@ DEFAULT_RELAY_LIMITS = RelayLimits(
     max_reservations=4,  # 4 active reservations
 )
 
-# Message for testing
-TEST_MESSAGE = b"Hello, Circuit Relay!"
-TEST_RESPONSE = b"Hello from the other side!"
-
-
-# Stream handler for testing
-async def echo_stream_handler(stream):
-    """Simple echo handler that responds to messages."""
-    logger.info("Echo handler received stream")
-    try:
-        while True:
-            data = await stream.read(MAX_READ_LEN)
-            if not data:
-                logger.info("Stream closed by remote")
-                break
-
-            logger.info("Received data: %s", data)
-            await stream.write(TEST_RESPONSE)
-            logger.info("Sent response")
-    except (StreamEOF, StreamReset) as e:
-        logger.info("Stream ended: %s", str(e))
-    except Exception as e:
-        logger.error("Error in echo handler: %s", str(e))
-    finally:
-        await stream.close()
+# Strict limits for the relay limits test
+STRICT_LIMITS = RelayLimits(
+    duration=DEFAULT_RELAY_LIMITS.duration,
+    data=DEFAULT_RELAY_LIMITS.data,
+    max_circuit_conns=1,  # Only allow one circuit
+    max_reservations=2,  # Allow both clients to reserve
+)
 
+# Limits for the relay and client in the message routing test
+ROUTING_LIMITS = RelayLimits(
+    duration=3600,  # 1 hour
+    data=1024 * 1024 * 100,  # 100 MB
+    max_circuit_conns=10,
+    max_reservations=5,
+)
 
-@pytest.mark.trio
-async def test_circuit_v2_transport_initialization():
-    """Test that the Circuit v2 transport initializes correctly."""
-    async with HostFactory.create_batch_and_listen(1) as hosts:
-        host = hosts[0]
-
-        # Create a protocol instance
-        limits = RelayLimits(
-            duration=DEFAULT_RELAY_LIMITS.duration,
-            data=DEFAULT_RELAY_LIMITS.data,
-            max_circuit_conns=DEFAULT_RELAY_LIMITS.max_circuit_conns,
-            max_reservations=DEFAULT_RELAY_LIMITS.max_reservations,
-        )
+
+@pytest.fixture
+def host():
+    """
+    Lightweight host stub for tests that never touch the network.
+
+    The protocol, discovery and transport constructors only store the host,
+    so there is no need to bootstrap a listening swarm for these tests.
+    """
+    return SimpleNamespace()
+
+
+@pytest.fixture(scope="module")
+def peer_info():
+    """Destination peer for relay selection; read-only, so shared by tests."""
+    return PeerInfo(ID(b"\x01" * 32), [])
+
+
+@pytest.fixture
+def transport_factory():
+    """
+    Build a client-side Circuit v2 transport with a non-reserving discovery.
+
+    Returns a callable producing ``(transport, discovery, protocol)``.
+    """
+
+    def _make(host, limits=DEFAULT_RELAY_LIMITS, config=None):
         protocol = CircuitV2Protocol(host, limits, allow_hop=False)
+        transport = CircuitV2Transport(host, protocol, config or RelayConfig())
+        # Reuse the transport's own discovery rather than building a second one
+        discovery = transport.discovery
+        discovery.auto_reserve = False
+        return transport, discovery, protocol
 
-        config = RelayConfig()
+    return _make
 
-        # Create a discovery instance
-        discovery = RelayDiscovery(
-            host=host,
-            auto_reserve=False,
-            discovery_interval=config.discovery_interval,
-            max_relays=config.max_relays,
-        )
 
-        # Create the transport with the necessary components
-        transport = CircuitV2Transport(host, protocol, config)
-        # Replace the discovery with our manually created one
-        transport.discovery = discovery
-
-        # Verify transport properties
-        assert transport.host == host, "Host not set correctly"
-        assert transport.protocol == protocol, "Protocol not set correctly"
-        assert transport.config == config, "Config not set correctly"
-        assert hasattr(transport, "discovery"), (
-            "Transport should have a discovery instance"
-        )
+def test_circuit_v2_transport_initialization(host, transport_factory):
+    """Test that the Circuit v2 transport initializes correctly."""
+    config = RelayConfig()
+    transport, discovery, protocol = transport_factory(host, config=config)
+
+    # Verify transport properties
+    assert transport.host == host, "Host not set correctly"
+    assert transport.protocol == protocol, "Protocol not set correctly"
+    assert transport.config is config, "Config not set correctly"
+
+    # Verify the transport wired its discovery from the host and config
+    assert discovery.host is host, "Discovery host not set correctly"
+    assert discovery.discovery_interval == config.discovery_interval
+    assert discovery.max_relays == config.max_relays
+    assert discovery.stream_timeout == config.timeouts.discovery_stream_timeout
+    assert discovery.peer_protocol_timeout == config.timeouts.peer_protocol_timeout
 
 
 @pytest.mark.trio
-async def test_circuit_v2_transport_add_relay():
+async def test_circuit_v2_transport_add_relay(host, transport_factory):
     """Test adding a relay to the transport."""
-    async with HostFactory.create_batch_and_listen(2) as hosts:
-        host, relay_host = hosts
-
-        # Create a protocol instance
-        limits = RelayLimits(
-            duration=DEFAULT_RELAY_LIMITS.duration,
-            data=DEFAULT_RELAY_LIMITS.data,
-            max_circuit_conns=DEFAULT_RELAY_LIMITS.max_circuit_conns,
-            max_reservations=DEFAULT_RELAY_LIMITS.max_reservations,
-        )
-        protocol = CircuitV2Protocol(host, limits, allow_hop=False)
+    _, discovery, _ = transport_factory(host)
 
-        config = RelayConfig()
+    # The relay is never dialed, so a bare peer ID is enough; with
+    # auto-reserve off, adding it makes no reservation attempt
+    relay_id = ID(b"\x02" * 32)
+    await discovery._add_relay(relay_id)
 
-        # Create a discovery instance
-        discovery = RelayDiscovery(
-            host=host,
-            auto_reserve=False,
-            discovery_interval=config.discovery_interval,
-            max_relays=config.max_relays,
-        )
+    # Verify relay was added
+    assert discovery.get_relays() == [relay_id], (
+        "Relay should be in discovery's relay list"
+    )
+    assert discovery.get_relay_info(relay_id).peer_id == relay_id
 
-        # Create the transport with the necessary components
-        transport = CircuitV2Transport(host, protocol, config)
-        # Replace the discovery with our manually created one
-        transport.discovery = discovery
 
-        relay_id = relay_host.get_id()
-        now = time.time()
-        relay_info = RelayInfo(peer_id=relay_id, discovered_at=now, last_seen=now)
+@pytest.mark.trio
+async def test_select_relay_returns_discovered_relay(
+    host, transport_factory, peer_info, autojump_clock
+):
+    """Test that relay selection picks a discovered relay without waiting."""
+    transport, discovery, _ = transport_factory(host)
+    relay_id = ID(b"\x02" * 32)
+    now = time.time()
+    discovery._discovered_relays[relay_id] = RelayInfo(
+        peer_id=relay_id, discovered_at=now, last_seen=now
+    )
+
+    start = trio.current_time()
+    assert await transport._select_relay(peer_info) == relay_id
+    assert trio.current_time() == start
 
-        async def mock_add_relay(peer_id):
-            discovery._discovered_relays[peer_id] = relay_info
 
-        discovery._add_relay = mock_add_relay  # Type ignored in test context
-        discovery._discovered_relays[relay_id] = relay_info
+@pytest.mark.trio
+async def test_select_relay_gives_up_without_relays(
+    host, transport_factory, peer_info, autojump_clock
+):
+    """Test that relay selection backs off and gives up when none are known."""
+    # The autojump clock skips the one-second backoff between attempts
+    transport, _, _ = transport_factory(host)
 
-        # Verify relay was added
-        assert relay_id in discovery._discovered_relays, (
-            "Relay should be in discovery's relay list"
-        )
+    start = trio.current_time()
+    assert await transport._select_relay(peer_info) is None
+    attempts = transport.client_config.max_auto_relay_attempts
+    assert trio.current_time() - start == pytest.approx(attempts)
 
 
 @pytest.mark.trio
@@ -170,79 +176,30 @@ async def test_circuit_v2_transport_dial_through_relay():
     """Test dialing a peer through a relay."""
     async with HostFactory.create_batch_and_listen(3) as hosts:
         client_host, relay_host, target_host = hosts
-        logger.info("Created hosts for test_circuit_v2_transport_dial_through_relay")
-        logger.info("Client host ID: %s", client_host.get_id())
-        logger.info("Relay host ID: %s", relay_host.get_id())
-        logger.info("Target host ID: %s", target_host.get_id())
-
-        # Setup relay with Circuit v2 protocol
-        limits = RelayLimits(
-            duration=DEFAULT_RELAY_LIMITS.duration,
-            data=DEFAULT_RELAY_LIMITS.data,
-            max_circuit_conns=DEFAULT_RELAY_LIMITS.max_circuit_conns,
-            max_reservations=DEFAULT_RELAY_LIMITS.max_reservations,
-        )
-
-        # Register test handler on target
-        test_protocol = "/test/echo/1.0.0"
-        target_host.set_stream_handler(TProtocol(test_protocol), echo_stream_handler)
-
-        client_config = RelayConfig()
-        client_protocol = CircuitV2Protocol(client_host, limits, allow_hop=False)
-
-        # Create a discovery instance
-        client_discovery = RelayDiscovery(
-            host=client_host,
-            auto_reserve=False,
-            discovery_interval=client_config.discovery_interval,
-            max_relays=client_config.max_relays,
-        )
-
-        # Create the transport with the necessary components
-        client_transport = CircuitV2Transport(
-            client_host, client_protocol, client_config
+        logger.debug(
+            "Test hosts: client_host=%s relay_host=%s target_host=%s",
+            client_host.get_id(),
+            relay_host.get_id(),
+            target_host.get_id(),
         )
-        # Replace the discovery with our manually created one
-        client_transport.discovery = client_discovery
 
-        # Mock the get_relay method to return our relay_host
-        relay_id = relay_host.get_id()
-        client_discovery.get_relay = lambda: relay_id
-
-        # Connect client to relay and relay to target
+        # Connect client to relay and relay to target; the dials are independent
         try:
             with trio.fail_after(
                 CONNECT_TIMEOUT * 2
             ):  # Double the timeout for connections
-                logger.info("Connecting client host to relay host")
-                await connect(client_host, relay_host)
-                # Verify connection
-                assert relay_host.get_id() in client_host.get_network().connections, (
-                    "Client not connected to relay"
-                )
-                assert client_host.get_id() in relay_host.get_network().connections, (
-                    "Relay not connected to client"
-                )
-                logger.info("Client-Relay connection verified")
-
-                # Wait to ensure connection is fully established
-                await trio.sleep(SLEEP_TIME)
-
-                logger.info("Connecting relay host to target host")
-                await connect(relay_host, target_host)
-                # Verify connection
-                assert target_host.get_id() in relay_host.get_network().connections, (
-                    "Relay not connected to target"
-                )
-                assert relay_host.get_id() in target_host.get_network().connections, (
-                    "Target not connected to relay"
-                )
-                logger.info("Relay-Target connection verified")
-
-                # Wait to ensure connection is fully established
-                await trio.sleep(SLEEP_TIME)
-
-                logger.info("All connections established and verified")
+                logger.debug("Connecting client-relay and relay-target hosts")
+                async with trio.open_nursery() as nursery:
+                    nursery.start_soon(connect, client_host, relay_host)
+                    nursery.start_soon(connect, relay_host, target_host)
+
+                # Wait until both sides have registered each connection
+                await wait_until_connected(client_host, relay_host, CONNECT_TIMEOUT)
+                logger.debug("Client-Relay connection verified")
+                await wait_until_connected(relay_host, target_host, CONNECT_TIMEOUT)
+                logger.debug("Relay-Target connection verified")
+
+                logger.debug("All connections established and verified")
         except Exception as e:
             logger.error("Failed to connect peers: %s", str(e))
             raise
@@ -253,7 +210,9 @@ async def test_circuit_v2_transport_dial_through_relay():
 
 
 @pytest.mark.trio
-async def test_circuit_v2_transport_message_routing_through_relay():
+async def test_circuit_v2_transport_message_routing_through_relay(
+    transport_factory,
+):
     """
     Test end-to-end message transfer from source to destination through relay.
     """
@@ -267,51 +226,30 @@ async def test_circuit_v2_transport_message_routing_through_relay():
         )
 
         # Configure relay
-        limits = RelayLimits(
-            duration=3600,  # 1 hour
-            data=1024 * 1024 * 100,  # 100 MB
-            max_circuit_conns=10,
-            max_reservations=5,
-        )
         relay_config = RelayConfig(
-            roles=RelayRole.HOP | RelayRole.STOP | RelayRole.CLIENT, limits=limits
+            roles=RelayRole.HOP | RelayRole.STOP | RelayRole.CLIENT,
+            limits=ROUTING_LIMITS,
         )
-        relay_protocol = CircuitV2Protocol(relay_host, limits, allow_hop=True)
+        relay_protocol = CircuitV2Protocol(relay_host, ROUTING_LIMITS, allow_hop=True)
         CircuitV2Transport(relay_host, relay_protocol, relay_config)
         relay_host.set_stream_handler(PROTOCOL_ID, relay_protocol._handle_hop_stream)
         relay_host.set_stream_handler(
             STOP_PROTOCOL_ID, relay_protocol._handle_stop_stream
         )
 
-        client_limits = RelayLimits(
-            duration=3600,  # 1 hour
-            data=1024 * 1024 * 100,  # 100 MB
-            max_circuit_conns=10,
-            max_reservations=5,
-        )
         client_config = RelayConfig(
-            roles=RelayRole.CLIENT | RelayRole.STOP, limits=client_limits
-        )
-        client_protocol = CircuitV2Protocol(client_host, client_limits, allow_hop=False)
-        client_transport = CircuitV2Transport(
-            client_host, client_protocol, client_config
+            roles=RelayRole.CLIENT | RelayRole.STOP, limits=ROUTING_LIMITS
         )
-        client_discovery = RelayDiscovery(
-            host=client_host,
-            auto_reserve=False,
+        client_transport, client_discovery, _ = transport_factory(
+            client_host, limits=ROUTING_LIMITS, config=client_config
         )
-        client_transport.discovery = client_discovery
 
-        dest_limits = RelayLimits(
-            duration=DEFAULT_RELAY_LIMITS.duration,
-            data=DEFAULT_RELAY_LIMITS.data,
-            max_circuit_conns=DEFAULT_RELAY_LIMITS.max_circuit_conns,
-            max_reservations=DEFAULT_RELAY_LIMITS.max_reservations,
-        )
         dest_config = RelayConfig(
-            roles=RelayRole.STOP | RelayRole.CLIENT, limits=dest_limits
+            roles=RelayRole.STOP | RelayRole.CLIENT, limits=DEFAULT_RELAY_LIMITS
+        )
+        dest_protocol = CircuitV2Protocol(
+            target_host, DEFAULT_RELAY_LIMITS, allow_hop=False
         )
-        dest_protocol = CircuitV2Protocol(target_host, dest_limits, allow_hop=False)
         CircuitV2Transport(target_host, dest_protocol, dest_config)
         target_host.set_stream_handler(PROTOCOL_ID, dest_protocol._handle_hop_stream)
         target_host.set_stream_handler(
@@ -337,18 +275,13 @@ async def test_circuit_v2_transport_message_routing_through_relay():
         # Step 1: Destination connects to Relay
         with trio.fail_after(CONNECT_TIMEOUT):
             await connect(target_host, relay_host)
-            assert relay_host.get_id() in target_host.get_network().connections
-            assert target_host.get_id() in relay_host.get_network().connections
-
-        await trio.sleep(SLEEP_TIME)
+            await wait_until_connected(target_host, relay_host, CONNECT_TIMEOUT)
 
         # Step 2: Source connects to Relay
         with trio.fail_after(CONNECT_TIMEOUT):
             await connect(client_host, relay_host)
-            assert relay_host.get_id() in client_host.get_network().connections
-            assert client_host.get_id() in relay_host.get_network().connections
+            await wait_until_connected(client_host, relay_host, CONNECT_TIMEOUT)
 
-        await trio.sleep(SLEEP_TIME)
         relay_id = relay_host.get_id()
         client_discovery.get_relay = lambda: relay_id
 
@@ -371,7 +304,7 @@ async def test_circuit_v2_transport_message_routing_through_relay():
             await stream.close()
 
         # Wait until the destination handler receives the message
-        with trio.fail_after(SLEEP_TIME * 5):
+        with trio.fail_after(MESSAGE_TIMEOUT):
             await message_received.wait()
 
         # Assertions
@@ -389,64 +322,21 @@ async def test_circuit_v2_transport_relay_limits():
         logger.info("Created hosts for test_circuit_v2_transport_relay_limits")
 
         # Setup relay with strict limits
-        limits = RelayLimits(
-            duration=DEFAULT_RELAY_LIMITS.duration,
-            data=DEFAULT_RELAY_LIMITS.data,
-            max_circuit_conns=1,  # Only allow one circuit
-            max_reservations=2,  # Allow both clients to reserve
-        )
-        relay_protocol = CircuitV2Protocol(relay_host, limits, allow_hop=True)
-
-        # Register test handler on target
-        test_protocol = "/test/echo/1.0.0"
-        target_host.set_stream_handler(TProtocol(test_protocol), echo_stream_handler)
-
-        client_config = RelayConfig()
-
-        # Client 1 setup
-        client1_protocol = CircuitV2Protocol(
-            client1_host, DEFAULT_RELAY_LIMITS, allow_hop=False
-        )
-        client1_discovery = RelayDiscovery(
-            host=client1_host,
-            auto_reserve=False,
-            discovery_interval=client_config.discovery_interval,
-            max_relays=client_config.max_relays,
-        )
-        client1_transport = CircuitV2Transport(
-            client1_host, client1_protocol, client_config
-        )
-        client1_transport.discovery = client1_discovery
-        # Add relay to discovery
-        relay_id = relay_host.get_id()
-        client1_discovery.get_relay = lambda: relay_id
+        relay_protocol = CircuitV2Protocol(relay_host, STRICT_LIMITS, allow_hop=True)
 
-        # Client 2 setup
-        client2_protocol = CircuitV2Protocol(
-            client2_host, DEFAULT_RELAY_LIMITS, allow_hop=False
-        )
-        client2_discovery = RelayDiscovery(
-            host=client2_host,
-            auto_reserve=False,
-            discovery_interval=client_config.discovery_interval,
-            max_relays=client_config.max_relays,
-        )
-        client2_transport = CircuitV2Transport(
-            client2_host, client2_protocol, client_config
-        )
-        client2_transport.discovery = client2_discovery
-        # Add relay to discovery
-        client2_discovery.get_relay = lambda: relay_id
+        # Clients connect to the relay, and the relay to the target
+        links = [
+            (client1_host, relay_host),
+            (client2_host, relay_host),
+            (relay_host, target_host),
+        ]
 
         # Connect all peers
         try:
             with trio.fail_after(CONNECT_TIMEOUT):
-                # Connect clients to relay
-                await connect(client1_host, relay_host)
-                await connect(client2_host, relay_host)
-
-                # Connect relay to target
-                await connect(relay_host, target_host)
+                async with trio.open_nursery() as nursery:
+                    for dialer, listener in links:
+                        nursery.start_soon(connect, dialer, listener)
 
                 logger.info("All connections established")
         except Exception as e:
@@ -454,15 +344,10 @@ async def test_circuit_v2_transport_relay_limits():
             raise
 
         # Verify connections
-        assert relay_host.get_id() in client1_host.get_network().connections, (
-            "Client1 not connected to relay"
-        )
-        assert relay_host.get_id() in client2_host.get_network().connections, (
-            "Client2 not connected to relay"
-        )
-        assert target_host.get_id() in relay_host.get_network().connections, (
-            "Relay not connected to target"
-        )
+        for dialer, listener in links:
+            assert listener.get_id() in dialer.get_network().connections, (
+                f"{dialer.get_id()} not connected to {listener.get_id()}"
+            )
 
         # Verify the resource limits
         assert relay_protocol.resource_manager.limits.max_circuit_conns == 1, (
@@ -29,3 +29,17 @@ async def wait_until_listening(host, timeout=3):
             await trio.sleep(0.05)
         return
     raise RuntimeError("Timed out waiting for host to get an address")
+
+
+async def wait_until_connected(host_a: IHost, host_b: IHost, timeout=3):
+    """Wait until both hosts have registered a connection to each other."""
+    with trio.move_on_after(timeout):
+        while (
+            host_b.get_id() not in host_a.get_network().connections
+            or host_a.get_id() not in host_b.get_network().connections
+        ):
+            await trio.sleep(0.01)
+        return
+    raise RuntimeError(
+        f"Timed out waiting for {host_a.get_id()} and {host_b.get_id()} to connect"
+    )